@@ -12,6 +12,8 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <pybind11/numpy.h>
+#include <algorithm>
+#include <optional>
 
 namespace py = pybind11;
 using namespace multiqueue;
@@ -72,12 +74,18 @@ PYBIND11_MODULE(multiqueue_shm, m) {
              [](RingQueue<int>& self, int data, uint64_t timestamp) {
                  return self.try_push(data, timestamp);  // 使用 try_push 避免阻塞
              },
-             py::arg("data"), py::arg("timestamp") = 0)
+             py::arg("data"), py::arg("timestamp") = 0,
+             py::call_guard<py::gil_scoped_release>())
         .def("pop",
              [](RingQueue<int>& self) -> py::tuple {
                  int data;
                  uint64_t timestamp;
-                 bool success = self.try_pop(data, &timestamp);  // 使用 try_pop 避免阻塞
+                 bool success;
+                 {
+                     // 等待/CAS 期间释放 GIL，避免生产者与消费者线程在解释器锁上串行
+                     py::gil_scoped_release release;
+                     success = self.try_pop(data, &timestamp);  // 使用 try_pop 避免阻塞
+                 }
                  if (success) {
                      return py::make_tuple(data, timestamp);
                  }
@@ -88,12 +96,17 @@ PYBIND11_MODULE(multiqueue_shm, m) {
                  return self.push_with_timeout(data, timeout_ms, timestamp);
              },
              py::arg("data"), py::arg("timestamp") = 0, py::arg("timeout_ms") = 1000,
+             py::call_guard<py::gil_scoped_release>(),
              "Blocking push with timeout")
         .def("pop_blocking",
              [](RingQueue<int>& self, uint32_t timeout_ms) -> py::tuple {
                  int data;
                  uint64_t timestamp;
-                 bool success = self.pop_with_timeout(data, timeout_ms, &timestamp);
+                 bool success;
+                 {
+                     py::gil_scoped_release release;
+                     success = self.pop_with_timeout(data, timeout_ms, &timestamp);
+                 }
                  if (success) {
                      return py::make_tuple(data, timestamp);
                  }
@@ -102,17 +115,65 @@ PYBIND11_MODULE(multiqueue_shm, m) {
              py::arg("timeout_ms") = 1000,
              "Blocking pop with timeout")
         .def("try_push", &RingQueue<int>::try_push,
-             py::arg("data"), py::arg("timestamp") = 0)
+             py::arg("data"), py::arg("timestamp") = 0,
+             py::call_guard<py::gil_scoped_release>())
         .def("try_pop",
              [](RingQueue<int>& self) -> py::tuple {
                  int data;
                  uint64_t timestamp;
-                 bool success = self.try_pop(data, &timestamp);
+                 bool success;
+                 {
+                     py::gil_scoped_release release;
+                     success = self.try_pop(data, &timestamp);
+                 }
                  if (success) {
                      return py::make_tuple(data, timestamp);
                  }
                  return py::make_tuple(py::none(), py::none());
              })
+        .def("pop_many",
+             [](RingQueue<int>& self,
+                py::array_t<int64_t, py::array::c_style> data_out,
+                py::array_t<uint64_t, py::array::c_style> ts_out) -> size_t {
+                 // 一次调用批量取出，循环在 C++ 内完成，避免逐个元素往返 Python
+                 auto data = data_out.mutable_unchecked<1>();
+                 auto ts = ts_out.mutable_unchecked<1>();
+                 size_t max_n = static_cast<size_t>(std::min(data.shape(0), ts.shape(0)));
+                 size_t n = 0;
+                 py::gil_scoped_release release;
+                 int value;
+                 uint64_t timestamp;
+                 while (n < max_n && self.try_pop(value, &timestamp)) {
+                     data(n) = value;
+                     ts(n) = timestamp;
+                     ++n;
+                 }
+                 return n;
+             },
+             py::arg("data_out").noconvert(), py::arg("ts_out").noconvert(),
+             "Pop up to len(data_out) items into preallocated int64/uint64 arrays, return count")
+        .def("push_many",
+             [](RingQueue<int>& self,
+                py::array_t<int64_t, py::array::c_style | py::array::forcecast> data,
+                std::optional<py::array_t<uint64_t, py::array::c_style | py::array::forcecast>> timestamps) -> size_t {
+                 auto values = data.unchecked<1>();
+                 size_t max_n = static_cast<size_t>(values.shape(0));
+                 const uint64_t* ts = nullptr;
+                 if (timestamps) {
+                     if (static_cast<size_t>(timestamps->size()) < max_n) {
+                         throw std::invalid_argument("timestamps shorter than data");
+                     }
+                     ts = timestamps->data();
+                 }
+                 size_t n = 0;
+                 py::gil_scoped_release release;
+                 while (n < max_n && self.try_push(static_cast<int>(values(n)), ts ? ts[n] : 0)) {
+                     ++n;
+                 }
+                 return n;
+             },
+             py::arg("data"), py::arg("timestamps") = py::none(),
+             "Push items from an int64 array until the queue is full, return count")
         .def("size", &RingQueue<int>::size)
         .def("empty", &RingQueue<int>::empty)
         .def("full", &RingQueue<int>::full)
@@ -131,12 +192,17 @@ PYBIND11_MODULE(multiqueue_shm, m) {
              [](RingQueue<double>& self, double data, uint64_t timestamp) {
                  return self.try_push(data, timestamp);  // 使用 try_push 避免阻塞
              },
-             py::arg("data"), py::arg("timestamp") = 0)
+             py::arg("data"), py::arg("timestamp") = 0,
+             py::call_guard<py::gil_scoped_release>())
         .def("pop",
              [](RingQueue<double>& self) -> py::tuple {
                  double data;
                  uint64_t timestamp;
-                 bool success = self.try_pop(data, &timestamp);  // 使用 try_pop 避免阻塞
+                 bool success;
+                 {
+                     py::gil_scoped_release release;
+                     success = self.try_pop(data, &timestamp);  // 使用 try_pop 避免阻塞
+                 }
                  if (success) {
                      return py::make_tuple(data, timestamp);
                  }
@@ -146,12 +212,17 @@ PYBIND11_MODULE(multiqueue_shm, m) {
              [](RingQueue<double>& self, double data, uint64_t timestamp, uint32_t timeout_ms) {
                  return self.push_with_timeout(data, timeout_ms, timestamp);
              },
-             py::arg("data"), py::arg("timestamp") = 0, py::arg("timeout_ms") = 1000)
+             py::arg("data"), py::arg("timestamp") = 0, py::arg("timeout_ms") = 1000,
+             py::call_guard<py::gil_scoped_release>())
         .def("pop_blocking",
              [](RingQueue<double>& self, uint32_t timeout_ms) -> py::tuple {
                  double data;
                  uint64_t timestamp;
-                 bool success = self.pop_with_timeout(data, timeout_ms, &timestamp);
+                 bool success;
+                 {
+                     py::gil_scoped_release release;
+                     success = self.pop_with_timeout(data, timeout_ms, &timestamp);
+                 }
                  if (success) {
                      return py::make_tuple(data, timestamp);
                  }
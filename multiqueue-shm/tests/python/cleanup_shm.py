@@ -3,29 +3,71 @@
 清理共享内存脚本
 """
 
+import ctypes
+import ctypes.util
 import os
+import pwd
+import subprocess
 import sys
 
 # 在 macOS 上，Boost.Interprocess 使用 System V 共享内存
 # 我们需要清理遗留的共享内存段
 
-print("清理共享内存...")
+IPC_RMID = 0
+PROC_SYSVIPC_SHM = "/proc/sysvipc/shm"
 
-# 获取所有共享内存段
-output = os.popen("ipcs -m").read()
-lines = output.split('\n')
 
-cleaned = 0
-for line in lines:
-    parts = line.split()
-    if len(parts) >= 2 and parts[0] == 'm':
-        shmid = parts[1]
-        try:
-            os.system(f"ipcrm -m {shmid}")
+def list_shm_ids():
+    """列出当前用户创建、且已无进程附加的 System V 共享内存段 id
+
+    其他用户或仍在使用中（nattch > 0）的段属于别的程序，不能删除。
+    Linux 直接读取 /proc/sysvipc/shm（第 2/7/8 列为 shmid/nattch/uid），
+    其他平台（macOS）只调用一次 ipcs -m -o 并按表头定位 OWNER/NATTCH 列。
+    """
+    uid = os.getuid()
+    if os.path.exists(PROC_SYSVIPC_SHM):
+        shmids = []
+        with open(PROC_SYSVIPC_SHM) as f:
+            next(f, None)  # 跳过表头
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 8 and int(parts[7]) == uid and int(parts[6]) == 0:
+                    shmids.append(int(parts[1]))
+        return shmids
+
+    owner = pwd.getpwuid(uid).pw_name
+    output = subprocess.check_output(["ipcs", "-m", "-o"], text=True)
+    shmids = []
+    owner_col = nattch_col = None
+    for line in output.splitlines():
+        parts = line.split()
+        if parts and parts[0] == 'T' and "OWNER" in parts and "NATTCH" in parts:
+            owner_col, nattch_col = parts.index("OWNER"), parts.index("NATTCH")
+        elif owner_col is not None and len(parts) > max(owner_col, nattch_col) and parts[0] == 'm':
+            if parts[owner_col] == owner and parts[nattch_col] == "0":
+                shmids.append(int(parts[1]))
+    return shmids
+
+
+def main():
+    print("清理共享内存...")
+
+    # 直接调用 shmctl(IPC_RMID)，避免每个段 fork+exec 一次 ipcrm
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    libc.shmctl.restype = ctypes.c_int
+
+    cleaned = 0
+    for shmid in list_shm_ids():
+        if libc.shmctl(shmid, IPC_RMID, None) == 0:
             print(f"  删除共享内存段: {shmid}")
             cleaned += 1
-        except:
-            pass
+        else:
+            err = ctypes.get_errno()
+            print(f"  无法删除共享内存段 {shmid}: {os.strerror(err)}", file=sys.stderr)
+
+    print(f"\n清理完成！删除了 {cleaned} 个共享内存段")
 
-print(f"\n清理完成！删除了 {cleaned} 个共享内存段")
 
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import os
 import time
 import threading
 
+import numpy as np
+
 # 添加构建输出目录到路径
 build_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../build/python'))
 sys.path.insert(0, build_dir)
@@ -227,37 +229,48 @@ def test_multithreading():
     queue = mq.RingQueueInt("test_queue_py_mt", config)
     
     count = 1000
-    results = []
+    results = np.empty(count, dtype=np.int64)
+    ts_scratch = np.empty(count, dtype=np.uint64)
+    received = 0
     producer_done = threading.Event()
     
     def producer():
         print("  [Producer] 开始...")
-        for i in range(count):
-            while not queue.push(i, 0):
-                time.sleep(0.0001)  # 队列满时等待
-            if i % 200 == 0:
-                print(f"  [Producer] 进度: {i}/{count}")
+        data = np.arange(count, dtype=np.int64)
+        pushed = 0
+        while pushed < count:
+            n = queue.push_many(data[pushed:pushed + 256])
+            if n == 0:
+                # 队列满：在原生代码中带超时阻塞写入一个元素（GIL 已释放）
+                if not queue.push_blocking(int(data[pushed]), 0, 50):
+                    continue
+                n = 1
+            if (pushed + n) // 200 > pushed // 200:
+                print(f"  [Producer] 进度: {pushed + n}/{count}")
+            pushed += n
         producer_done.set()
         print("  [Producer] 完成")
     
     def consumer():
+        nonlocal received
         print("  [Consumer] 开始...")
-        consumed = 0
+        # 直接批量写入预分配的结果数组，避免逐个元素装箱成 Python int
         while True:
-            data, _ = queue.pop()
-            if data is not None:
-                results.append(data)
-                consumed += 1
-                if consumed % 200 == 0:
-                    print(f"  [Consumer] 进度: {consumed}/{count}")
+            n = queue.pop_many(results[received:], ts_scratch[received:])
+            if n == 0 and received < count:
+                # 队列空：在原生代码中带超时阻塞等待下一个元素，超时返回 None
+                data, ts = queue.pop_blocking(50)
+                if data is not None:
+                    results[received] = data
+                    n = 1
+            if n:
+                if (received + n) // 200 > received // 200:
+                    print(f"  [Consumer] 进度: {received + n}/{count}")
+                received += n
             
             # 生产者完成且收集到足够数据则退出
-            if producer_done.is_set() and len(results) == count:
+            if producer_done.is_set() and received == count:
                 break
-            
-            # 队列空且生产者未完成，稍等
-            if data is None and not producer_done.is_set():
-                time.sleep(0.0001)
         print("  [Consumer] 完成")
     
     # 启动线程
@@ -275,10 +288,10 @@ def test_multithreading():
     print("  消费者线程已结束")
     
     # 验证
-    print(f"  验证结果: 收集到 {len(results)} 个元素")
-    assert len(results) == count
+    print(f"  验证结果: 收集到 {received} 个元素")
+    assert received == count
     results.sort()
-    assert results == list(range(count))
+    assert np.array_equal(results, np.arange(count))
     
     print("✓ 多线程测试通过")
     print("[测试 9/9] test_multithreading - 完成")
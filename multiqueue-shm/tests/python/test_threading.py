@@ -5,9 +5,10 @@
 
 import sys
 import os
-import time
 import threading
 
+import numpy as np
+
 build_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../build/python'))
 sys.path.insert(0, build_dir)
 
@@ -30,32 +31,43 @@ producer_done = threading.Event()
 
 def producer():
     print(f"[Producer] 开始生产 {count} 个元素...")
-    for i in range(count):
-        while not queue.push(i, 0):
-            time.sleep(0.0001)  # 队列满时等待
-        if i % 20 == 0:
-            print(f"[Producer] 已生产 {i}/{count}")
+    data = np.arange(count, dtype=np.int64)
+    pushed = 0
+    while pushed < count:
+        n = queue.push_many(data[pushed:pushed + 32])
+        if n == 0:
+            # 队列满：在原生代码中带超时阻塞写入一个元素（GIL 已释放）
+            if not queue.push_blocking(int(data[pushed]), 0, 50):
+                continue
+            n = 1
+        if (pushed + n) // 20 > pushed // 20:
+            print(f"[Producer] 已生产 {pushed + n}/{count}")
+        pushed += n
     producer_done.set()
     print(f"[Producer] 完成！")
 
 def consumer():
     consumed = 0
+    data_buf = np.empty(32, dtype=np.int64)
+    ts_buf = np.empty(32, dtype=np.uint64)
     print(f"[Consumer] 开始消费...")
     while True:
-        data, _ = queue.pop()
-        if data is not None:
-            results.append(data)
-            consumed += 1
-            if consumed % 20 == 0:
-                print(f"[Consumer] 已消费 {consumed}/{count}")
+        n = queue.pop_many(data_buf, ts_buf)
+        if n == 0:
+            # 队列空：在原生代码中带超时阻塞等待下一个元素，超时返回 None
+            data, ts = queue.pop_blocking(50)
+            if data is not None:
+                data_buf[0] = data
+                n = 1
+        if n:
+            results.extend(data_buf[:n].tolist())
+            if (consumed + n) // 20 > consumed // 20:
+                print(f"[Consumer] 已消费 {consumed + n}/{count}")
+            consumed += n
         
         # 检查是否完成
         if producer_done.is_set() and len(results) == count:
             break
-        
-        # 如果队列空了但生产者还没完成，稍等一下
-        if data is None and not producer_done.is_set():
-            time.sleep(0.0001)
     
     print(f"[Consumer] 完成！消费了 {len(results)} 个元素")
 
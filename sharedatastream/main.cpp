@@ -12,10 +12,16 @@ PYBIND11_MODULE(shared_ring_queue, m) {
     py::class_<SharedRingQueueProducer>(m, "SharedRingQueueProducer")
         .def(py::init<const std::string&, uint32_t, uint32_t, uint32_t, const std::string&>(),
              py::arg("shm_name"), py::arg("queue_len"), py::arg("data_block_size"), py::arg("total_refs"), py::arg("metadata"))
-        .def("push", [](SharedRingQueueProducer& self, py::bytes data) {
-            std::string s = data;
-            return self.push(s.data(), s.size());
-        })
+        .def("push", [](SharedRingQueueProducer& self, py::buffer data) {
+            // 直接从 buffer（bytes / memoryview / ndarray）拷贝进环形队列节点，不经过中间 std::string
+            py::buffer_info info = request_contiguous(data);
+            size_t nbytes = static_cast<size_t>(info.size) * static_cast<size_t>(info.itemsize);
+            if (nbytes > self.node_size() - sizeof(Node)) {
+                throw std::invalid_argument("data larger than data_block_size");
+            }
+            py::gil_scoped_release release;
+            return self.push(info.ptr, static_cast<uint32_t>(nbytes));
+        }, py::arg("data"))
         .def_property_readonly("metadata", &SharedRingQueueProducer::metadata)
         .def_property_readonly("node_count", &SharedRingQueueProducer::node_count)
         .def_property_readonly("node_size", &SharedRingQueueProducer::node_size)
@@ -27,7 +33,11 @@ PYBIND11_MODULE(shared_ring_queue, m) {
         .def("pop", [](SharedRingQueueConsumer& self) {
             std::vector<char> buf(self.node_size());
             uint32_t sz = 0;
-            int ret = self.pop(buf.data(), sz);
+            int ret;
+            {
+                py::gil_scoped_release release;
+                ret = self.pop(buf.data(), sz);
+            }
             if (ret && sz > 0) 
             {
                 std::cout <<"sz :" <<sz<<std::endl;
@@ -36,6 +46,18 @@ PYBIND11_MODULE(shared_ring_queue, m) {
             std::cout <<"sz :" <<sz<<std::endl;
             return py::bytes();
         })
+        .def("pop_into", [](SharedRingQueueConsumer& self, py::buffer out) {
+            // 弹出到调用方预分配的可写 buffer（bytearray / ndarray），返回字节数，避免每次新建 bytes
+            py::buffer_info info = request_contiguous(out, true);
+            size_t capacity = static_cast<size_t>(info.size) * static_cast<size_t>(info.itemsize);
+            if (capacity < self.node_size() - sizeof(Node)) {
+                throw std::invalid_argument("output buffer smaller than data_block_size");
+            }
+            uint32_t sz = 0;
+            py::gil_scoped_release release;
+            self.pop(info.ptr, sz);
+            return sz;
+        }, py::arg("out"))
         .def_property_readonly("metadata", &SharedRingQueueConsumer::metadata)
         .def_property_readonly("node_count", &SharedRingQueueConsumer::node_count)
         .def_property_readonly("node_size", &SharedRingQueueConsumer::node_size)
@@ -52,6 +74,7 @@ PYBIND11_MODULE(shared_ring_queue, m) {
              py::arg("batch_size") = 1, py::arg("timeout_ms") = 10)
         .def("register_callback", &SharedMemProcessor::register_callback)
         .def("start", &SharedMemProcessor::start)
-        .def("stop", &SharedMemProcessor::stop)
+        // stop 会 join 回调线程，而回调线程需要获取 GIL 才能调用 Python，持有 GIL 等待会死锁
+        .def("stop", &SharedMemProcessor::stop, py::call_guard<py::gil_scoped_release>())
         .def("push_to_output", &SharedMemProcessor::push_to_output);
 } 
\ No newline at end of file
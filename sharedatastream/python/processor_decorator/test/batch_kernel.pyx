@@ -0,0 +1,34 @@
+# cython: language_level=3
+# 消费端批量解包：直接通过 buffer 协议取每帧内存，memcpy 到预分配 float32 数组，
+# 省去每帧 np.frombuffer 创建对象和 dtype 分派
+cimport cython
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
+from libc.string cimport memcpy
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef Py_ssize_t process_batch(list batch, float[::1] out, float scale=1.0) except -1:
+    """把 batch 中各帧按顺序拼接写入 out，scale != 1 时原地缩放，返回写入的 float 个数"""
+    cdef Py_buffer view
+    cdef Py_ssize_t pos = 0
+    cdef Py_ssize_t n, i
+    cdef float* dst = &out[0] if out.shape[0] > 0 else NULL
+    for b in batch:
+        PyObject_GetBuffer(b, &view, PyBUF_SIMPLE)
+        try:
+            if view.len % sizeof(float) != 0:
+                raise ValueError("frame size is not a multiple of 4 bytes")
+            n = view.len // sizeof(float)
+            if pos + n > out.shape[0]:
+                raise ValueError("output buffer too small for batch")
+            if n:
+                memcpy(dst + pos, view.buf, view.len)
+        finally:
+            PyBuffer_Release(&view)
+        pos += n
+    if scale != 1.0:
+        with nogil:
+            for i in range(pos):
+                dst[i] *= scale
+    return pos
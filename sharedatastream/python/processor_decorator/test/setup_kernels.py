@@ -0,0 +1,14 @@
+# 编译频谱合成内核与消费端批量解包内核: python setup_kernels.py build_ext --inplace
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+setup(
+    name="spectrum-kernel",
+    ext_modules=cythonize(
+        [
+            Extension("spectrum_kernel", ["spectrum_kernel.pyx"]),
+            Extension("batch_kernel", ["batch_kernel.pyx"]),
+        ],
+        compiler_directives={"language_level": 3},
+    ),
+)
@@ -0,0 +1,70 @@
+# cython: language_level=3
+# 频谱合成内核：每种调制一个类型化循环，原地对 spec 取最大值
+# noise 由调用方用 NumPy 批量生成，下标 0 对应 c - width（越界部分跳过）
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef void synth_am(float[::1] spec, int c, int bw, float amp, const float[::1] noise) noexcept nogil:
+    cdef Py_ssize_t lo = c - bw if c - bw > 0 else 0
+    cdef Py_ssize_t hi = c + bw if c + bw < spec.shape[0] else spec.shape[0]
+    cdef Py_ssize_t i
+    cdef float side, v
+    for i in range(lo, hi):
+        side = <float>(i - c if i >= c else c - i)
+        v = amp - (side / bw) * 20 + noise[i - c + bw]
+        if v > spec[i]:
+            spec[i] = v
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef void synth_fm(float[::1] spec, int c, int bw, float amp, const float[::1] noise) noexcept nogil:
+    cdef Py_ssize_t lo = c - bw if c - bw > 0 else 0
+    cdef Py_ssize_t hi = c + bw if c + bw < spec.shape[0] else spec.shape[0]
+    cdef Py_ssize_t i
+    cdef float d, v
+    cdef float scale = 20.0 / (2 * (bw / 2.0) * (bw / 2.0))
+    for i in range(lo, hi):
+        d = <float>(i - c)
+        v = amp - d * d * scale + noise[i - c + bw]
+        if v > spec[i]:
+            spec[i] = v
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef void synth_flat(float[::1] spec, int c, int width, float amp, const float[::1] noise) noexcept nogil:
+    # qam / pulse / 单载波：平顶加抖动，仅抖动幅度不同
+    cdef Py_ssize_t lo = c - width if c - width > 0 else 0
+    cdef Py_ssize_t hi = c + width if c + width < spec.shape[0] else spec.shape[0]
+    cdef Py_ssize_t i
+    cdef float v
+    for i in range(lo, hi):
+        v = amp + noise[i - c + width]
+        if v > spec[i]:
+            spec[i] = v
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef void synth_ofdm(float[::1] spec, int c, int bw, int n_carriers, float amp, const float[::1] noise) noexcept nogil:
+    # noise 长度为 n_carriers * 4，每个子载波占 4 个点
+    cdef Py_ssize_t points = spec.shape[0]
+    cdef Py_ssize_t k, i, carrier_idx
+    cdef float v
+    for k in range(n_carriers):
+        carrier_idx = c - bw // 2 + k * bw // n_carriers
+        if carrier_idx < 0 or carrier_idx >= points:
+            continue
+        for i in range(carrier_idx - 2, carrier_idx + 2):
+            if i < 0 or i >= points:
+                continue
+            v = amp + noise[k * 4 + i - carrier_idx + 2]
+            if v > spec[i]:
+                spec[i] = v
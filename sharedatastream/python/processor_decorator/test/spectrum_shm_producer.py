@@ -1,6 +1,8 @@
 import numpy as np
 import time
+import struct
 import sys
+from dataclasses import dataclass
 from processor_decorator import sharedmem_producer
 import random
 
@@ -9,6 +11,28 @@ DEFAULT_FREQ_END = 8e9  # 8 GHz
 DEFAULT_POINTS = int((DEFAULT_FREQ_END - DEFAULT_FREQ_START) / 50000)  # 默认点数
 NOISE_FLOOR = -120
 
+# 每帧拆成 FRAME_CHUNKS 块分别推送，单块约 40 KB，读写时只触及缓存可容纳的工作集
+# 块头: u16 块序号, u16 总块数, u32 帧号；块 seq 覆盖频点 [seq*_CHUNK_POINTS, (seq+1)*_CHUNK_POINTS)
+FRAME_CHUNKS = 16
+_CHUNK_POINTS = -(-DEFAULT_POINTS // FRAME_CHUNKS)
+_CHUNK_HEADER = struct.Struct("<HHI")
+
+# 模块私有随机源：PCG64 比旧版全局 MT19937 快，且不共享 random 模块的全局状态
+_rng = np.random.default_rng()
+_pyrng = random.Random()
+
+# 帧缓冲常驻复用，原地合成后以 memoryview 零拷贝交给共享内存写入
+_SCRATCH = np.empty(DEFAULT_POINTS, dtype=np.float32)
+# 分块发送缓冲：块头与数据拼在一起，yield 后立即写入共享内存，下一块再覆盖
+_CHUNK_BUF = bytearray(_CHUNK_HEADER.size + _CHUNK_POINTS * 4)
+_frame_id = 0
+
+# 以信号中心为原点的偏移模板，按最大带宽一次生成，合成时只切片不再逐信号 arange
+_MAX_BW = int(DEFAULT_POINTS * 0.02) + 1
+_SIDE = np.arange(-_MAX_BW, _MAX_BW + 1, dtype=np.float32)
+_SIDE_ABS = np.abs(_SIDE)
+_SIDE_SQ = _SIDE * _SIDE
+
 
 def get_params():
     if len(sys.argv) >= 5:
@@ -22,97 +46,152 @@ def get_params():
         return {
             "out_shm": "RingQueueSpectrum",
             "out_queue_len": 1024,
-            "out_block_size": DEFAULT_POINTS * 4,  # float32
+            "out_block_size": _CHUNK_HEADER.size + _CHUNK_POINTS * 4,  # 块头 + float32
             "interval": 0.025,
         }
 
 
+@dataclass(slots=True)
+class Signal:
+    """活跃信号参数，slots 属性访问比 dict 取键更快"""
+    center_idx: int
+    bw: int
+    amp: float
+    modulation: str
+    remain: int
+
+
 # 信号池，管理信号生命周期
 global_active_signals = []
 
 
+def _synth_numpy(spectrum, mod, c, bw, amp):
+    """按信号切片向量化合成（无编译内核时使用）"""
+    points = spectrum.size
+    if mod == "ofdm":
+        n_carriers = _pyrng.randint(4, 16)
+        carrier_idx = c - bw // 2 + np.arange(n_carriers) * bw // n_carriers
+        carrier_idx = carrier_idx[(carrier_idx >= 0) & (carrier_idx < points)]
+        idx = (carrier_idx[:, None] + np.arange(-2, 2)).ravel()
+        idx = idx[(idx >= 0) & (idx < points)]
+        vals = amp + _rng.uniform(-2, 2, idx.size).astype(np.float32)
+        # 子载波可能重叠，用 maximum.at 保证重复下标也取最大值
+        np.maximum.at(spectrum, idx, vals)
+        return
+    half = bw if mod in ("am", "fm", "qam", "pulse") else 2
+    lo = max(0, c - half)
+    hi = min(points, c + half)
+    if lo >= hi:
+        return
+    # [lo, hi) 相对中心的偏移对应模板下标 [_MAX_BW + lo - c, _MAX_BW + hi - c)
+    t0 = _MAX_BW + lo - c
+    t1 = _MAX_BW + hi - c
+    n = hi - lo
+    if mod == "am":
+        vals = amp - _SIDE_ABS[t0:t1] * (20 / bw) + _rng.uniform(-3, 3, n)
+    elif mod == "fm":
+        vals = amp - _SIDE_SQ[t0:t1] * (20 / (2 * (bw / 2) ** 2)) + _rng.uniform(-3, 3, n)
+    elif mod == "qam":
+        vals = amp + _rng.uniform(-5, 5, n)
+    elif mod == "pulse":
+        vals = amp + _rng.uniform(-10, 10, n)
+    else:
+        vals = amp + _rng.uniform(-2, 2, n)
+    seg = spectrum[lo:hi]
+    np.maximum(seg, vals.astype(np.float32), out=seg)
+
+
+def _synth_kernel(spectrum, mod, c, bw, amp):
+    """Cython 内核合成：噪声用 NumPy 批量生成，逐点循环在 C 中完成"""
+    if mod == "ofdm":
+        n_carriers = _pyrng.randint(4, 16)
+        noise = _rng.uniform(-2, 2, n_carriers * 4).astype(np.float32)
+        spectrum_kernel.synth_ofdm(spectrum, c, bw, n_carriers, amp, noise)
+        return
+    kernel, width, jitter = _KERNEL_TABLE.get(mod, _KERNEL_TABLE["carrier"])
+    width = bw if width is None else width
+    noise = _rng.uniform(-jitter, jitter, 2 * width).astype(np.float32)
+    kernel(spectrum, c, width, amp, noise)
+
+
+try:
+    import spectrum_kernel
+except ImportError:
+    # 未编译内核（python setup_kernels.py build_ext --inplace）时回退到 NumPy 实现
+    spectrum_kernel = None
+    synth_signal = _synth_numpy
+else:
+    # 调制 -> (内核函数, 半宽(None 表示取 bw), 抖动幅度)
+    _KERNEL_TABLE = {
+        "am": (spectrum_kernel.synth_am, None, 3),
+        "fm": (spectrum_kernel.synth_fm, None, 3),
+        "qam": (spectrum_kernel.synth_flat, None, 5),
+        "pulse": (spectrum_kernel.synth_flat, None, 10),
+        "carrier": (spectrum_kernel.synth_flat, 2, 2),
+    }
+    synth_signal = _synth_kernel
+
+
+# 候选信号参数池（按列存放），一次批量抽取 _POOL_SIZE 组，用完再补充
+_MODULATIONS = np.array(["am", "fm", "qam", "ofdm", "pulse", "carrier"])
+_POOL_SIZE = 256
+_pool_centers = _pool_bws = _pool_amps = _pool_mods = _pool_remains = None
+_pool_idx = _POOL_SIZE
+
+
+def _refill_pool(points):
+    global _pool_centers, _pool_bws, _pool_amps, _pool_mods, _pool_remains, _pool_idx
+    _pool_centers = _rng.integers(int(points * 0.1), int(points * 0.9), _POOL_SIZE, endpoint=True)
+    _pool_bws = _rng.integers(int(points * 0.002), int(points * 0.02), _POOL_SIZE, endpoint=True)
+    _pool_amps = _rng.uniform(-60, -20, _POOL_SIZE)
+    _pool_mods = _rng.choice(_MODULATIONS, _POOL_SIZE)
+    _pool_remains = _rng.integers(40 * 4, 80 * 4, _POOL_SIZE, endpoint=True)  # 1~2秒
+    _pool_idx = 0
+
+
+def _next_candidate(points):
+    """从参数池取出一组新信号参数"""
+    global _pool_idx
+    if _pool_idx >= _POOL_SIZE:
+        _refill_pool(points)
+    i = _pool_idx
+    _pool_idx += 1
+    return Signal(
+        center_idx=int(_pool_centers[i]),
+        bw=int(_pool_bws[i]),
+        amp=float(_pool_amps[i]),
+        modulation=str(_pool_mods[i]),
+        remain=int(_pool_remains[i]),
+    )
+
+
 @sharedmem_producer(get_params())
 def spectrum_producer():
-    global global_active_signals
+    global global_active_signals, _frame_id
     points = DEFAULT_POINTS
     # 1. 更新信号池生命周期
     for sig in global_active_signals:
-        sig["remain"] -= 1
-    global_active_signals = [sig for sig in global_active_signals if sig["remain"] > 0]
+        sig.remain -= 1
+    global_active_signals = [sig for sig in global_active_signals if sig.remain > 0]
     # 2. 随机补充新信号
-    if len(global_active_signals) < 3 and random.random() < 0.1:
-        modulation = random.choice(["am", "fm", "qam", "ofdm", "pulse", "carrier"])
-        center_idx = random.randint(int(points * 0.1), int(points * 0.9))
-        bw = random.randint(int(points * 0.002), int(points * 0.02))
-        amp = random.uniform(-60, -20)
-        remain = random.randint(40 * 4, 80 * 4)  # 1~2秒
-        global_active_signals.append(
-            {
-                "center_idx": center_idx,
-                "bw": bw,
-                "amp": amp,
-                "modulation": modulation,
-                "remain": remain,
-            }
-        )
+    if len(global_active_signals) < 3 and _pyrng.random() < 0.1:
+        global_active_signals.append(_next_candidate(points))
     # 3. 生成底噪
-    spectrum = [NOISE_FLOOR for _ in range(points)]
+    spectrum = _SCRATCH
+    spectrum[:] = NOISE_FLOOR
     # 4. 合成信号并加抖动
     for sig in global_active_signals:
-        mod = sig.get("modulation", "carrier")
-        if mod == "am":
-            for i in range(
-                max(0, sig["center_idx"] - sig["bw"]),
-                min(points, sig["center_idx"] + sig["bw"]),
-            ):
-                side = abs(i - sig["center_idx"])
-                val = sig["amp"] - (side / sig["bw"]) * 20 + np.random.uniform(-3, 3)
-                spectrum[i] = max(spectrum[i], val)
-        elif mod == "fm":
-            for i in range(
-                max(0, sig["center_idx"] - sig["bw"]),
-                min(points, sig["center_idx"] + sig["bw"]),
-            ):
-                val = (
-                    sig["amp"]
-                    - ((i - sig["center_idx"]) ** 2) / (2 * (sig["bw"] / 2) ** 2) * 20
-                    + np.random.uniform(-3, 3)
-                )
-                spectrum[i] = max(spectrum[i], val)
-        elif mod == "qam":
-            for i in range(
-                max(0, sig["center_idx"] - sig["bw"]),
-                min(points, sig["center_idx"] + sig["bw"]),
-            ):
-                val = sig["amp"] + np.random.uniform(-5, 5)
-                spectrum[i] = max(spectrum[i], val)
-        elif mod == "ofdm":
-            n_carriers = random.randint(4, 16)
-            for k in range(n_carriers):
-                carrier_idx = (
-                    sig["center_idx"] - sig["bw"] // 2 + k * sig["bw"] // n_carriers
-                )
-                if 0 <= carrier_idx < points:
-                    for i in range(
-                        max(0, carrier_idx - 2), min(points, carrier_idx + 2)
-                    ):
-                        val = sig["amp"] + np.random.uniform(-2, 2)
-                        spectrum[i] = max(spectrum[i], val)
-        elif mod == "pulse":
-            for i in range(
-                max(0, sig["center_idx"] - sig["bw"]),
-                min(points, sig["center_idx"] + sig["bw"]),
-            ):
-                val = sig["amp"] + np.random.uniform(-10, 10)
-                spectrum[i] = max(spectrum[i], val)
-        else:
-            for i in range(
-                max(0, sig["center_idx"] - 2), min(points, sig["center_idx"] + 2)
-            ):
-                val = sig["amp"] + np.random.uniform(-2, 2)
-                spectrum[i] = max(spectrum[i], val)
-    arr = np.array(spectrum, dtype=np.float32)
-    return arr.tobytes()
+        synth_signal(spectrum, sig.modulation, sig.center_idx, sig.bw, sig.amp)
+    # 5. 分块推送，消费端按帧号和块序号重组
+    frame_id = _frame_id
+    _frame_id = (_frame_id + 1) & 0xFFFFFFFF
+    header_size = _CHUNK_HEADER.size
+    for seq in range(FRAME_CHUNKS):
+        chunk = memoryview(spectrum[seq * _CHUNK_POINTS:(seq + 1) * _CHUNK_POINTS]).cast("B")
+        end = header_size + chunk.nbytes
+        _CHUNK_HEADER.pack_into(_CHUNK_BUF, 0, seq, FRAME_CHUNKS, frame_id)
+        _CHUNK_BUF[header_size:end] = chunk
+        yield memoryview(_CHUNK_BUF)[:end]
 
 
 if __name__ == "__main__":
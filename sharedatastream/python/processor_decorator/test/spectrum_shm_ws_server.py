@@ -1,4 +1,5 @@
 import numpy as np
+import struct
 import sys
 import asyncio
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
@@ -11,6 +12,11 @@ DEFAULT_FREQ_START = 0  # 0 Hz
 DEFAULT_FREQ_END = 8e9  # 8 GHz
 DEFAULT_POINTS = int((DEFAULT_FREQ_END - DEFAULT_FREQ_START) / 50000)  # 默认点数
 
+# 与生产端一致的分块格式：块头 u16 块序号, u16 总块数, u32 帧号
+FRAME_CHUNKS = 16
+_CHUNK_POINTS = -(-DEFAULT_POINTS // FRAME_CHUNKS)
+_CHUNK_HEADER = struct.Struct("<HHI")
+
 
 def get_params():
     if len(sys.argv) >= 6:
@@ -25,26 +31,61 @@ def get_params():
         return {
             "in_shm": "RingQueueSpectrum",
             "in_queue_len": 1024,
-            "in_block_size": DEFAULT_POINTS * 4,
+            "in_block_size": _CHUNK_HEADER.size + _CHUNK_POINTS * 4,
             "batch_size": 1,
             "timeout_ms": 50,
         }
 
 
-buffer = []
+buffer = None
+# 重组缓冲轮换使用：正在发送的完整帧不会被下一帧的块覆盖
+_FRAME_POOL = [np.empty(DEFAULT_POINTS, dtype=np.float32) for _ in range(3)]
+_pool_idx = 0
+_pending_id = None  # 正在重组的帧号
+_pending_count = 0  # 该帧已收到的块数
+# 每个 WebSocket 连接一个 Event，新帧到达时统一置位；发送慢时多帧自然合并为一次发送最新帧
+_subscribers = set()
+_loop = None
+
+
+def _notify_subscribers():
+    for event in _subscribers:
+        event.set()
 
 
 @sharedmem_consumer(get_params())
 def on_spectrum_batch(batch):
-    global buffer
+    global buffer, _pool_idx, _pending_id, _pending_count
+    completed = False
     for b in batch:
-        arr = np.frombuffer(b, dtype=np.float32)
-        buffer = arr.tolist()  # 只保留最新一帧
+        seq, total, frame_id = _CHUNK_HEADER.unpack_from(b)
+        if frame_id != _pending_id:
+            # 单生产者按序写入：新帧号出现时，未收齐的旧帧直接丢弃
+            _pending_id = frame_id
+            _pending_count = 0
+            # 未收齐的帧不会发布，连续丢帧时轮换可能绕回已发布的 buffer 所在槽位，需跳过
+            _pool_idx = (_pool_idx + 1) % len(_FRAME_POOL)
+            if _FRAME_POOL[_pool_idx] is buffer:
+                _pool_idx = (_pool_idx + 1) % len(_FRAME_POOL)
+        chunk = np.frombuffer(b, dtype=np.float32, offset=_CHUNK_HEADER.size)
+        start = seq * _CHUNK_POINTS
+        _FRAME_POOL[_pool_idx][start:start + chunk.size] = chunk
+        _pending_count += 1
+        if _pending_count == total:
+            buffer = _FRAME_POOL[_pool_idx]  # 只保留最新的完整帧
+            completed = True
+    # 回调运行在 C++ 线程中，需线程安全地唤醒事件循环
+    if completed and _loop is not None:
+        _loop.call_soon_threadsafe(_notify_subscribers)
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    global _loop
     await websocket.accept()
+    _loop = asyncio.get_running_loop()
+    new_frame = asyncio.Event()
+    _subscribers.add(new_frame)
     try:
         # 首包推送参数信息
         await websocket.send_json(
@@ -54,14 +95,17 @@ async def websocket_endpoint(websocket: WebSocket):
                 "points": DEFAULT_POINTS,
             }
         )
+        if buffer is not None:
+            new_frame.set()
         while True:
-            if buffer:
-                arr = np.array(buffer, dtype=np.float32)
-                await websocket.send_bytes(arr.tobytes())
-                # print(time.time())
-            await asyncio.sleep(0.025)
+            await new_frame.wait()
+            new_frame.clear()
+            await websocket.send_bytes(memoryview(buffer).cast("B"))
+            # print(time.time())
     except WebSocketDisconnect:
         print("WebSocket 客户端断开连接")
+    finally:
+        _subscribers.discard(new_frame)
 
 
 if __name__ == "__main__":
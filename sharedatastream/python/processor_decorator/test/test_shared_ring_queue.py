@@ -36,9 +36,30 @@ def test_consumer():
         if (i+1) % 100 == 0:
             print(f"[Python Consumer] popped: {i+1}")
 
+def test_consumer_pop_into():
+    shm_name = "RingQueueSharedMemory44"
+    queue_len = 1024
+    data_block_size = 128
+    msg_count = 1000
+    consumer = shared_ring_queue.SharedRingQueueConsumer(
+        shm_name, queue_len, data_block_size
+    )
+    buf = bytearray(data_block_size)  # 复用同一块输出缓冲
+    for i in range(msg_count):
+        while True:
+            size = consumer.pop_into(buf)
+            if size:
+                break
+            time.sleep(0.001)
+        assert size == data_block_size and buf == b'A' * data_block_size
+        if (i+1) % 100 == 0:
+            print(f"[Python Consumer pop_into] popped: {i+1}")
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == "consumer":
         test_consumer()
+    elif len(sys.argv) > 1 and sys.argv[1] == "consumer_pop_into":
+        test_consumer_pop_into()
     else:
         test_producer() 
\ No newline at end of file
@@ -36,14 +36,52 @@ def get_producer_params():
             'interval': 0.01
         }
 
+try:
+    from batch_kernel import process_batch
+except ImportError:
+    # 未编译内核（python setup_kernels.py build_ext --inplace）时逐帧 frombuffer，再由 _half 减半
+    process_batch = None
+    # 输出缓冲常驻复用：每个结果在 yield 后立即被写入共享内存，下一次才会被覆盖
+    _HALF_SCRATCH = np.empty(get_consumer_params()['in_block_size'] // 4, dtype=np.float32)
+else:
+    # 整批解包缓冲：按 batch_size 帧预分配，一次调用完成拷贝和减半
+    _BATCH_SCRATCH = np.empty(
+        get_consumer_params()['batch_size'] * (get_consumer_params()['in_block_size'] // 4),
+        dtype=np.float32,
+    )
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _half(src, out):
+        # JIT 编译的逐点循环，首次调用编译并缓存到磁盘
+        for i in range(src.size):
+            out[i] = src[i] * np.float32(0.5)
+else:
+    def _half(src, out):
+        np.multiply(src, np.float32(0.5), out=out)
+
 @sharedmem_producer(get_producer_params())
 @sharedmem_consumer(get_consumer_params())
 def half_amp(batch):
     # batch: list[bytes]
+    if process_batch is not None:
+        process_batch(batch, _BATCH_SCRATCH, 0.5)
+        off = 0
+        for b in batch:
+            n = len(b) // 4
+            yield memoryview(_BATCH_SCRATCH[off:off + n]).cast('B')
+            off += n
+        return
     for b in batch:
         arr = np.frombuffer(b, dtype=np.float32)
-        arr2 = (arr * 0.5).astype(np.float32)
-        yield arr2.tobytes()
+        out = _HALF_SCRATCH[:arr.size]
+        _half(arr, out)
+        yield memoryview(out).cast('B')
 
 if __name__ == "__main__":
     import time
@@ -2,7 +2,11 @@ import numpy as np
 import sys
 from processor_decorator import sharedmem_consumer
 
-buffer = []
+# 固定大小环形缓冲，只保留最近 RING_SIZE 个点；绘图时才按时间顺序拼接
+RING_SIZE = 10000
+_ring = np.zeros(RING_SIZE, dtype=np.float32)
+_pos = 0     # 下一次写入位置
+_filled = 0  # 已写入的有效点数
 
 def get_params():
     # 支持命令行参数: in_shm queue_len block_size batch_size timeout_ms
@@ -23,15 +27,44 @@ def get_params():
             'timeout_ms': 50
         }
 
+try:
+    from batch_kernel import process_batch
+except ImportError:
+    # 未编译内核（python setup_kernels.py build_ext --inplace）时逐帧 frombuffer
+    process_batch = None
+else:
+    # 整批解包缓冲，整批拼接后只写一次环形缓冲
+    _BATCH_SCRATCH = np.empty(get_params()['batch_size'] * (get_params()['in_block_size'] // 4), dtype=np.float32)
+
+def _ring_write(arr):
+    global _pos, _filled
+    arr = arr[-RING_SIZE:]
+    n = arr.size
+    end = _pos + n
+    if end <= RING_SIZE:
+        _ring[_pos:end] = arr
+    else:
+        first = RING_SIZE - _pos
+        _ring[_pos:] = arr[:first]
+        _ring[:end - RING_SIZE] = arr[first:]
+    _pos = end % RING_SIZE
+    _filled = min(RING_SIZE, _filled + n)
+
 @sharedmem_consumer(get_params())
 def plot_sine(batch):
-    global buffer
-    for b in batch:
-        arr = np.frombuffer(b, dtype=np.float32)
-        buffer.extend(arr.tolist())
-    buffer = buffer[-10000:]
+    if process_batch is not None:
+        _ring_write(_BATCH_SCRATCH[:process_batch(batch, _BATCH_SCRATCH)])
+    else:
+        for b in batch:
+            _ring_write(np.frombuffer(b, dtype=np.float32))
     # 不返回
 
+def ring_snapshot():
+    """按时间顺序返回环形缓冲中的有效数据"""
+    if _filled < RING_SIZE:
+        return _ring[:_filled].copy()
+    return np.concatenate((_ring[_pos:], _ring[:_pos]))
+
 if __name__ == "__main__":
     import time
     import matplotlib.pyplot as plt
@@ -42,7 +75,8 @@ if __name__ == "__main__":
     ax.set_xlim(0, 10000)
     print("开始从共享内存读取并绘制正弦/余弦变形波...")
     while True:
-        if buffer:
+        buffer = ring_snapshot()
+        if buffer.size:
             line.set_ydata(buffer)
             line.set_xdata(np.arange(len(buffer)))
             ax.set_xlim(0, max(10000, len(buffer)))
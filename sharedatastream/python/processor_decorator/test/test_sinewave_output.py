@@ -1,3 +1,4 @@
+import math
 import numpy as np
 import time
 import sys
@@ -20,31 +21,41 @@ def get_params():
             'interval': 0.05
         }
 
+fs = 1000  # 采样率
+freq = 1   # 正弦波频率
+morph_period = 5  # 形状变化周期（秒）
+
+# 相邻采样点的相位增量（弧度），只算一次
+_TAU_OVER_FS = np.float32(2 * np.pi * freq / fs)
+# 按生产节拍推算时间（count * interval），不在每帧调用 time.time()
+_MORPH_STEP = 2 * math.pi * get_params()['interval'] / morph_period
+
+# 按块大小一次性分配，每帧原地计算，避免重复 arange 和临时数组；
+# 块内各点相对块起点的相位 θ 每帧相同，导入时算一次
+N = get_params()['out_block_size'] // 4
+_THETA = np.arange(N, dtype=np.float32) * _TAU_OVER_FS
+_Y = np.empty(N, dtype=np.float32)
+_TMP = np.empty(N, dtype=np.float32)
+_phase = 0.0  # 当前块起点相位（弧度），按 2π 取模，保证三角函数参数较小
+count = 0
+
 @sharedmem_producer(get_params())
 def sinewave_producer():
-    global t, count
-    fs = 1000  # 采样率
-    freq = 1   # 正弦波频率
-    morph_period = 5  # 形状变化周期（秒）
-    if 't' not in globals():
-        globals()['t'] = 0
-    if 'count' not in globals():
-        globals()['count'] = 0
-    t = globals()['t']
-    count = globals()['count']
-    now = time.time()
-    alpha = 0.5 * (1 + np.sin(2 * np.pi * now / morph_period))
-    x = np.arange(get_params()['out_block_size'] // 4, dtype=np.float32)
-    theta = 2 * np.pi * freq * (x + t) / fs
-    y = (1 - alpha) * np.sin(theta) + alpha * np.cos(theta)
-    data = y.astype(np.float32).tobytes()
-    t += len(x)
+    global _phase, count
+    alpha = 0.5 * (1 + math.sin(count * _MORPH_STEP))
+    # (1-α)·sinθ + α·cosθ = R·sin(θ+φ)，R = √(a²+b²)，φ = atan2(b, a)，只需一次 sin
+    a = 1 - alpha
+    b = alpha
+    r = math.sqrt(a * a + b * b)
+    phi = math.atan2(b, a)
+    np.add(_THETA, _phase + phi, out=_TMP)
+    np.sin(_TMP, out=_Y)
+    np.multiply(_Y, r, out=_Y)
+    _phase = (_phase + N * float(_TAU_OVER_FS)) % (2 * math.pi)
     count += 1
     if count % 20 == 0:
         print(f"count: {count}")
-    globals()['t'] = t
-    globals()['count'] = count
-    return data
+    return memoryview(_Y).cast('B')
 
 if __name__ == "__main__":
     print("开始写入正弦/余弦变形波到共享内存...")
@@ -1,11 +1,71 @@
-﻿from setuptools import setup, find_packages
+﻿from setuptools import setup, find_packages, Distribution
 from setuptools.command.build_ext import build_ext
 from setuptools.command.build import build as build_orig
+from distutils import log  # 导入 setuptools 后由其内置的 distutils 提供，新旧版本的日志级别都能正确映射
 import subprocess
 import os
+import sys
 import shutil
 import sysconfig
 import platform
+from pathlib import Path
+
+# setup.py 会被 egg_info/build/install/bdist_wheel 等命令反复导入，平台判断和包查找只做一次
+_IS_WIN = platform.system() == "Windows"
+_EXT_SUFFIX = sysconfig.get_config_var("EXT_SUFFIX") or (".pyd" if _IS_WIN else ".so")
+_PACKAGES = find_packages(where="python")
+_PACKAGE_DATA = {
+    "processor_decorator": [
+        "*.pyd",  # Windows 扩展名
+        "*.dll",  # 可能的依赖项
+        "*.py"
+    ]
+} if _IS_WIN else {"processor_decorator": ["*.so", "*.py"]}
+
+
+def _find_tool(name):
+    """优先使用 PyPI 上 cmake / ninja 包自带的可执行文件（版本随构建依赖固定，Windows 下无需配置 PATH），其次查找 PATH"""
+    try:
+        module = __import__(name)
+        bin_dir = getattr(module, "CMAKE_BIN_DIR", None) or getattr(module, "BIN_DIR", None)
+    except ImportError:
+        bin_dir = None
+    return (bin_dir and shutil.which(name, path=bin_dir)) or shutil.which(name)
+
+
+_CMAKE = _find_tool("cmake") or "cmake"
+_NINJA = _find_tool("ninja")
+
+# pyproject.toml 的构建依赖里装有 pybind11 时，把它的 CMake 配置目录交给 find_package，隔离构建环境中也能找到
+try:
+    import pybind11
+    _PYBIND11_CMAKE_DIR = Path(pybind11.get_cmake_dir()).as_posix()
+except ImportError:
+    _PYBIND11_CMAKE_DIR = None
+
+_SOURCE_DIR = Path(__file__).resolve().parent
+_CMAKE_LISTS = _SOURCE_DIR / "CMakeLists.txt"
+# 扩展由 CMake 直接输出到包目录，无需再从构建目录查找和复制
+_PACKAGE_DIR = _SOURCE_DIR / "python" / "processor_decorator"
+# 参与编译 shared_ring_queue 扩展的文件，与 CMakeLists.txt 中 pybind11_add_module 的源文件保持一致
+_EXT_SOURCES = [_CMAKE_LISTS] + [
+    _SOURCE_DIR / name for name in ("main.cpp", "shared_ring_queue.cpp", "shared_ring_queue.hpp")
+]
+
+
+def _read_cmake_cache(path):
+    """解析 CMakeCache.txt，返回 {变量名: 值}；文件不存在时返回空 dict"""
+    entries = {}
+    try:
+        with path.open(encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith(("#", "//")) or "=" not in line:
+                    continue
+                key, value = line.rstrip("\n").split("=", 1)
+                entries[key.split(":", 1)[0]] = value
+    except FileNotFoundError:
+        pass
+    return entries
 
 class CMakeBuild(build_ext):
     def run(self):
@@ -14,68 +74,150 @@ class CMakeBuild(build_ext):
         if os.getenv("CMAKE_BUILD_TYPE"):
             build_type = os.getenv("CMAKE_BUILD_TYPE")
         
-        build_dir = os.path.abspath("build")
-        os.makedirs(build_dir, exist_ok=True)
+        # 构建目录按平台和解释器区分并长期保留，重复安装时只做增量编译；可用 SHAREDATASTREAM_CMAKE_BUILD_DIR 指定
+        build_dir = Path(os.getenv(
+            "SHAREDATASTREAM_CMAKE_BUILD_DIR",
+            _SOURCE_DIR / "build" / f"cmake.{sysconfig.get_platform()}-{sys.implementation.cache_tag}",
+        )).resolve()
         
-        # 生成构建系统
-        subprocess.check_call([
-            "cmake", 
-            "..",
-            f"-DCMAKE_BUILD_TYPE={build_type}"
-        ], cwd=build_dir)
+        # 按本机 CPU 指令集编译（-march=native / -mcpu=native / MSVC /arch:AVX2），SHAREDATASTREAM_NATIVE=0 关闭；
+        # cibuildwheel 打包分发的 wheel 需在其他机器上运行，默认关闭，只用基线指令集
+        native_default = "0" if os.getenv("CIBUILDWHEEL") else "1"
+        native = os.getenv("SHAREDATASTREAM_NATIVE", native_default).lower() not in ("0", "off", "false", "no", "")
         
-        # 编译项目
-        subprocess.check_call([
-            "cmake", 
-            "--build", ".", 
-            "--config", build_type
-        ], cwd=build_dir)
-
-        # Windows 专用处理
-        ext_suffix = sysconfig.get_config_var("EXT_SUFFIX") or ".pyd"
-        pyd_name = f"shared_ring_queue{ext_suffix}"
+        # 扩展文件名（Windows 下为 .pyd）
+        dst_pyd = _PACKAGE_DIR / f"shared_ring_queue{_EXT_SUFFIX}"
         
-        # 处理 Windows 的构建目录结构 (Debug/Release)
-        print("---------------------", platform.system() == "Windows", platform.system())
-        build_subdir = build_type if platform.system() == "Windows" else ""
-        print("--------------build_subdir------",build_subdir)
-        src_pyd = os.path.join(build_dir, build_subdir, pyd_name)
-        # print("-----------src_pyd-----------",)
-        # 检查文件是否存在
-        if not os.path.exists(src_pyd):
-            # 尝试其他可能路径
-            src_pyd = os.path.join(build_dir, "python", "processor_decorator",build_subdir, pyd_name)
-            if not os.path.exists(src_pyd):
-                raise FileNotFoundError(f"Cannot find compiled .pyd: {src_pyd}")
-
-        # 目标路径
-        dst_dir = os.path.join("python", "processor_decorator")
-        os.makedirs(dst_dir, exist_ok=True)
-        dst_pyd = os.path.join(dst_dir, pyd_name)
+        cmake_defs = {
+            "CMAKE_BUILD_TYPE": build_type,
+            "ENABLE_NATIVE_OPT": "ON" if native else "OFF",
+            # 显式指定当前解释器，CMake 缓存该路径后不再搜索，也保证扩展与运行 setup.py 的 Python 版本一致
+            "Python3_EXECUTABLE": sys.executable,
+            "CMAKE_LIBRARY_OUTPUT_DIRECTORY": _PACKAGE_DIR.as_posix(),
+            # 多配置生成器（Visual Studio / Ninja Multi-Config）会在输出目录下追加 Debug/Release 子目录，需按配置单独指定
+            f"CMAKE_LIBRARY_OUTPUT_DIRECTORY_{build_type.upper()}": _PACKAGE_DIR.as_posix(),
+            # 生成 compile_commands.json 供 clangd / IDE 做增量分析（Visual Studio 生成器不支持，忽略即可）
+            "CMAKE_EXPORT_COMPILE_COMMANDS": "ON",
+        }
+        # 第三方依赖（Boost 等）可预先安装到共享前缀，用 SHAREDATASTREAM_DEPS_PREFIX 指定（多个用 os.pathsep 分隔），
+        # 各 Python 版本的构建目录共用同一份，不必各自重新查找或编译；
+        # 未设置时也传空值参与比较，取消设置后能触发重新配置并清掉缓存中的旧前缀
+        prefixes = [Path(p).resolve().as_posix() for p in os.getenv("SHAREDATASTREAM_DEPS_PREFIX", "").split(os.pathsep) if p]
+        cmake_defs["CMAKE_PREFIX_PATH"] = ";".join(prefixes)
+        
+        cmake_cache = build_dir / "CMakeCache.txt"
+        cached = _read_cmake_cache(cmake_cache)
+        options_match = all(cached.get(k) == v for k, v in cmake_defs.items())
+        # pybind11 / ninja 来自构建环境，pip 隔离构建时每次路径都不同，不参与选项比较；
+        # 只有缓存中的路径已不存在（临时构建环境被删除）时才需要重新配置
+        stale = any(
+            cached.get(k) and not cached[k].endswith("-NOTFOUND") and not Path(cached[k]).exists()
+            for k in ("CMAKE_MAKE_PROGRAM", "pybind11_DIR")
+        )
+        
+        # 上次构建成功后源文件都未修改、产物仍在且选项未变时直接跳过，SHAREDATASTREAM_FORCE_REBUILD=1 强制重新构建；
+        # 以构建 stamp 而不是产物时间判断：只改 CMakeLists.txt 时不一定重新链接，产物时间不会更新
+        built_stamp = build_dir / ".built.stamp"
+        if options_match and not os.getenv("SHAREDATASTREAM_FORCE_REBUILD") and dst_pyd.exists():
+            try:
+                built_mtime = built_stamp.stat().st_mtime
+            except OSError:
+                built_mtime = None
+            if built_mtime is not None and max(src.stat().st_mtime for src in _EXT_SOURCES) < built_mtime:
+                self.announce(f"{dst_pyd} is up-to-date, skipping CMake build", level=log.INFO)
+                return
         
-        # 复制文件
-        shutil.copy2(src_pyd, dst_pyd)
-        print(f"Copied {src_pyd} -> {dst_pyd}")
+        # 生成构建系统：上次配置成功（stamp 比 CMakeLists.txt 新）且各选项与缓存一致时跳过；
+        # 配置失败时 CMakeCache.txt 也会存在，所以以 stamp 而不是缓存文件判断是否配置过
+        stamp = build_dir / ".configured.stamp"
+        if (
+            not options_match
+            or stale
+            or not stamp.exists()
+            or _CMAKE_LISTS.stat().st_mtime > stamp.stat().st_mtime
+        ):
+            cmake_args = [f"-D{k}={v}" for k, v in cmake_defs.items()]
+            # 有 Ninja 时优先使用（比 Make/MSBuild 调度更快，空构建几乎瞬间完成）；
+            # 用户设置了 CMAKE_GENERATOR 时交给 CMake 自行读取；已有缓存时沿用原生成器，避免生成器不一致报错
+            if (
+                not os.getenv("CMAKE_GENERATOR")
+                and not cached
+                and _NINJA
+                # Windows 下 Ninja 需要已激活的 MSVC 环境，否则回退到默认的 Visual Studio 生成器
+                and (not _IS_WIN or shutil.which("cl"))
+            ):
+                cmake_args[:0] = ["-GNinja", f"-DCMAKE_MAKE_PROGRAM={_NINJA}"]
+            elif cached.get("CMAKE_GENERATOR") == "Ninja" and _NINJA:
+                # 每次重新配置都传入当前 ninja，替换缓存中可能已失效的路径
+                cmake_args.append(f"-DCMAKE_MAKE_PROGRAM={_NINJA}")
+            # pybind11 目录经环境变量 CMAKE_PREFIX_PATH 交给 find_package，不写入缓存的 CMAKE_PREFIX_PATH
+            env = os.environ.copy()
+            if _PYBIND11_CMAKE_DIR:
+                env["CMAKE_PREFIX_PATH"] = os.pathsep.join(
+                    p for p in (env.get("CMAKE_PREFIX_PATH"), _PYBIND11_CMAKE_DIR) if p
+                )
+            # 有 sccache/ccache 时作为编译器启动器，换分支或清空构建目录后命中缓存无需重新编译（可用 ccache -s 查看命中率）；
+            # 用户已导出 CMAKE_CXX_COMPILER_LAUNCHER 时由 CMake 自行读取
+            launcher = shutil.which("sccache") or shutil.which("ccache")
+            if launcher and not os.getenv("CMAKE_CXX_COMPILER_LAUNCHER"):
+                cmake_args.append(f"-DCMAKE_CXX_COMPILER_LAUNCHER={launcher}")
+            build_dir.mkdir(parents=True, exist_ok=True)
+            subprocess.check_call([_CMAKE, str(_SOURCE_DIR)] + cmake_args, cwd=build_dir, env=env)
+            stamp.touch()
+            # 在源码根目录放一个指向构建目录 compile_commands.json 的链接，clangd 默认在此查找
+            compile_commands = build_dir / "compile_commands.json"
+            link = _SOURCE_DIR / "compile_commands.json"
+            if compile_commands.exists():
+                link.unlink(missing_ok=True)
+                try:
+                    link.symlink_to(compile_commands)
+                except OSError:
+                    # Windows 未开启开发者模式时无权创建符号链接，退回复制
+                    shutil.copyfile(compile_commands, link)
+            cached = _read_cmake_cache(cmake_cache)
+        
+        # 编译项目：按 CPU 核数并行（Make/Ninja/MSBuild 均支持 --parallel），可用 CMAKE_BUILD_PARALLEL_LEVEL 覆盖
+        jobs = os.getenv("CMAKE_BUILD_PARALLEL_LEVEL") or str(os.cpu_count() or 1)
+        # 缓存中的 ninja 路径可能来自已删除的隔离构建环境，优先用当前找到的 ninja，其次是仍存在的缓存路径
+        ninja = None
+        if cached.get("CMAKE_GENERATOR") == "Ninja":
+            ninja = _NINJA or (cached.get("CMAKE_MAKE_PROGRAM") and shutil.which(cached["CMAKE_MAKE_PROGRAM"]))
+        if ninja:
+            # Ninja 直接调用，省去 cmake --build 这一层进程；CMakeLists.txt 变化时 ninja 会自行重新运行 cmake
+            subprocess.check_call([ninja, "-C", str(build_dir), "-j", jobs])
+        else:
+            subprocess.check_call([
+                _CMAKE, 
+                "--build", ".", 
+                "--config", build_type,
+                "--parallel", jobs
+            ], cwd=build_dir)
+
+        built_stamp.touch()
+        self.announce(f"Built {dst_pyd}", level=log.INFO)
 
 class Build(build_orig):
-    def run(self):
-        self.run_command("build_ext")
-        super().run()
+    # build_ext 排在最前且无条件执行（没有声明 ext_modules，默认谓词会跳过它），
+    # 扩展先生成到包目录，build_py 再按 package_data 收集；由 setuptools 统一调度，不会重复构建
+    sub_commands = [("build_ext", None)] + [
+        cmd for cmd in build_orig.sub_commands if cmd[0] != "build_ext"
+    ]
+
+class BinaryDistribution(Distribution):
+    # 扩展由 CMake 生成而非 ext_modules 声明，需显式告知含二进制扩展，
+    # bdist_wheel 才会打出平台相关的 wheel（cpXY-cpXY-<platform>，Root-Is-Purelib: false），cibuildwheel 才能修复和校验它
+    def has_ext_modules(self):
+        return True
 
 setup(
     name="processor-decorator",
     version="0.1",
-    packages=find_packages(where="python"),
+    packages=_PACKAGES,
     package_dir={"": "python"},
-    package_data={
-        "processor_decorator": [
-            "*.pyd",  # Windows 扩展名
-            "*.dll",  # 可能的依赖项
-            "*.py"
-        ]
-    } if platform.system() == "Windows" else {"processor_decorator": ["*.so", "*.py"]},
+    package_data=_PACKAGE_DATA,
     include_package_data=True,
-    zip_safe=False,
+    zip_safe=False,  # 包内含编译扩展，且 processor_decorator.py 以相对导入加载它，不能从 zip 中导入
+    distclass=BinaryDistribution,
     cmdclass={
         "build_ext": CMakeBuild,
         "build": Build,
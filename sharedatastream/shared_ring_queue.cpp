@@ -582,10 +582,15 @@ void SharedMemProcessor::callback_thread_func() {
     }
 }
 
-bool SharedMemProcessor::push_to_output(const pybind11::bytes& data) {
+bool SharedMemProcessor::push_to_output(const pybind11::buffer& data) {
     if (has_output_ && out_queue_) {
-        std::string s = data;
-        return out_queue_->push(s.data(), s.size());
+        pybind11::buffer_info info = request_contiguous(data);
+        size_t nbytes = static_cast<size_t>(info.size) * static_cast<size_t>(info.itemsize);
+        if (nbytes > out_queue_->node_size() - sizeof(Node)) {
+            throw std::invalid_argument("data larger than data_block_size");
+        }
+        pybind11::gil_scoped_release release;
+        return out_queue_->push(info.ptr, static_cast<uint32_t>(nbytes));
     }
     return false;
 }
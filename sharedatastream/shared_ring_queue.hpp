@@ -26,6 +26,19 @@ using namespace boost::interprocess;
 constexpr size_t METADATA_SIZE = 256;
 constexpr size_t MAX_CONSUMER = 32;
 
+// 请求 buffer 协议对象（bytes / memoryview / ndarray）的内存，要求 C 连续，才能一次 memcpy
+inline pybind11::buffer_info request_contiguous(const pybind11::buffer& buf, bool writable = false) {
+    pybind11::buffer_info info = buf.request(writable);
+    pybind11::ssize_t expected_stride = info.itemsize;
+    for (pybind11::ssize_t i = info.ndim - 1; i >= 0; --i) {
+        if (info.shape[i] > 1 && info.strides[i] != expected_stride) {
+            throw std::invalid_argument("buffer must be C-contiguous");
+        }
+        expected_stride *= info.shape[i];
+    }
+    return info;
+}
+
 struct alignas(8) Node {
     interprocess_mutex node_mutex;
     uint32_t next_offset;
@@ -127,7 +140,8 @@ public:
     void register_callback(pybind11::function cb);
     void start();
     void stop();
-    bool push_to_output(const pybind11::bytes& data);
+    // 接受任意支持 buffer 协议的对象（bytes / memoryview / ndarray），直接从其内存拷贝，避免中间 bytes
+    bool push_to_output(const pybind11::buffer& data);
 private:
     void input_thread_func();
     void callback_thread_func();